@@ -343,6 +343,17 @@ class Headers:
         """将headers转换为合适的WSGI格式"""
         return list(self)
 
+    def copy(self) -> Headers:
+        """返回一个浅层副本。已存储的值在添加时都已校验过，这里直接复制列表，
+        不再逐个经过 :meth:`add` 重新校验
+        """
+        rv = Headers()
+        rv._list = self._list.copy()
+        return rv
+
+    def __copy__(self) -> Headers:
+        return self.copy()
+
 class EnvironHeaders(ImmutableHeadersMixin, Headers):
     """Read only version of the headers from a WSGI environment. This 
     provides the same interface as (Headers) and is constructed from 
@@ -365,6 +376,9 @@ def _options_header_vkw(value: str, kw: dict[str, t.Any]) -> str:
 _newline_re = re.compile(r"[\r\n]")
 
 def _str_header_value(value: t.Any) -> str:
+    # 整数(如Content-Length)转换后不可能包含换行符，无需再检查。
+    # 只对精确的int类型走快速路径，int子类可以重写__str__
+    if type(value) is int: return str(value)
     if not isinstance(value, str): value = str(value)
 
     if _newline_re.search(value) is not None:
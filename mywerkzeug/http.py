@@ -417,6 +417,46 @@ def is_resource_modified(
 
     )
 
+_entity_headers = frozenset(
+    [
+        "allow",
+        "content-encoding",
+        "content-language",
+        "content-length",
+        "content-location",
+        "content-md5",
+        "content-range",
+        "content-type",
+        "expires",
+        "last-modified",
+    ]
+)
+
+def remove_entity_headers(
+    headers: ds.Headers | list[tuple[str, str]],
+    allowed: t.Iterable[str] = ("expires", "content-location"),
+) -> None:
+    """从一个list或者:class:`Headers`对象中移除所有的entity header, 原地修改。
+    根据:rfc:`2616` 10.3.5节，默认不会移除`Expires`和`Content-Location`。
+
+    :param headers: 一个list或者:class:`Headers`对象
+    :param allowed: 即使是entity header也需要保留的header列表
+    """
+    allowed = {x.lower() for x in allowed}
+    headers[:] = [
+        (key, value)
+        for key, value in headers
+        if not is_entity_header(key) or key.lower() in allowed
+    ]
+
+def is_entity_header(header: str) -> bool:
+    """检查header是否为entity header
+
+    :param header: 需要检查的header
+    :return: 若为entity header返回`True`，否则返回`False`
+    """
+    return header.lower() in _entity_headers
+
 _cookie_no_quote_re = re.compile(r"[\w!#$%&'()*+\-./:<=>?@\[\]^`{|}~]*", re.A)
 _cookie_slash_re = re.compile(rb"[\x00-\x19\",;\\\x7f-\xff]", re.A)
 _cookie_slash_map = {b'"': b'\\"', b"\\": b"\\\\"}
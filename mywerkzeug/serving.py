@@ -48,6 +48,9 @@ except AttributeError:
     af_unix = None
 
 LISTEN_QUEUE = 128
+SOCKET_BUFFER_SIZE = 1 << 20
+# 超过这个大小的响应数据块直接写入socket，而不经过wfile缓冲
+LARGE_CHUNK_SIZE = 1 << 16
 
 _TSSLContextArg = t.Optional[
     t.Union["ssl.SSLContext", tuple[str, t.Optional[str]], t.Literal["adhoc"]]
@@ -68,29 +71,72 @@ class DechunkedInput(io.RawIOBase):
         self._done = False
         self._len = 0
 
+def _send_parts(sock: socket.socket, parts: list[bytes]) -> None:
+    """把多个数据块聚集写入socket，不先拼接成一个新的bytes"""
+    if not hasattr(sock, "sendmsg"):
+        sock.sendall(b"".join(parts))
+        return
+    sent = sock.sendmsg(parts)
+    total = sum(len(part) for part in parts)
+    if sent < total:
+        # 部分发送，剩余部分退回到sendall
+        sock.sendall(b"".join(parts)[sent:])
+
+def _split_request_target(target: str) -> tuple[str, str]:
+    """将origin-form的请求目标拆分为path和query，丢弃fragment"""
+    fragment = target.find("#")
+    if fragment != -1:
+        target = target[:fragment]
+    query = target.find("?")
+    if query == -1:
+        return target, ""
+    return target[:query], target[query + 1 :]
+
+def _fast_unquote(s: str) -> str:
+    """不包含百分号编码的路径直接返回，跳过unquote的编解码过程"""
+    if "%" not in s:
+        return s
+    return unquote(s)
+
 class WSGIRequestHandler(BaseHTTPRequestHandler):
     """一个实现请求分发的request handler类"""
     server: BaseWSGIServer
+    # wfile使用64KB的BufferedWriter，chunk的长度行、数据和结尾可以合并为一次send
+    wbufsize = 65536
+    # make_environ中记录的客户端地址，避免访问日志时再从environ中查找
+    _remote_addr: str | None = None
+    _remote_port: int | None = None
 
     @property
     def server_version(self) -> str: # type: ignore
         return self.server._server_version
 
     def make_environ(self) -> WSGIEnvironment:
-        request_url = urlsplit(self.path)
         url_scheme = "http" if self.server.ssl_context is None else "https"
 
         if not self.client_address:
             self.client_address = ("<local>", 0)
         elif isinstance(self.client_address, str):
             self.client_address = (self.client_address, 0)
-        # 若路径中没有scheme，并且路径以两个斜线开始，第一个片段可能被错误地解析为 
-        # netloc，请将其重新添加到路径前面。
-        if not request_url.scheme and request_url.netloc:
-            path_info = f"/{request_url.netloc}{request_url.path}"
+        self._remote_addr, self._remote_port = self.client_address[:2]
+        request_host: str | None = None
+        if self.path.startswith("/") and not self.path.startswith("//"):
+            # origin-form (``/path?query``)是绝大多数请求的形式，无需完整的urlsplit
+            path_info, query = _split_request_target(self.path)
         else:
-            path_info = request_url.path
-        path_info = unquote(path_info)
+            request_url = urlsplit(self.path)
+            query = request_url.query
+            # 若路径中没有scheme，并且路径以两个斜线开始，第一个片段可能被错误地解析为 
+            # netloc，请将其重新添加到路径前面。
+            if not request_url.scheme and request_url.netloc:
+                path_info = f"/{request_url.netloc}{request_url.path}"
+            else:
+                path_info = request_url.path
+            # 根据 RFC 2616，如果 URL 是绝对路径，则使用该路径作为主机名。
+            # 使用“has a scheme”来表示绝对 URL。
+            if request_url.scheme and request_url.netloc:
+                request_host = request_url.netloc
+        path_info = _fast_unquote(path_info)
 
         environ: WSGIEnvironment = {
             "wsgi.version": (1, 0),
@@ -105,7 +151,7 @@ class WSGIRequestHandler(BaseHTTPRequestHandler):
             "REQUEST_METHOD": self.command,
             "SCRIPT_NAME": "",
             "PATH_INFO": _wsgi_encoding_dance(path_info),
-            "QUERY_STRING": _wsgi_encoding_dance(request_url.query),
+            "QUERY_STRING": _wsgi_encoding_dance(query),
             # Non-standard, added by mod_wsgi, uWSGI
             "REQUEST_URI": _wsgi_encoding_dance(self.path),
             # Non-standard, added by gunicorn
@@ -131,26 +177,32 @@ class WSGIRequestHandler(BaseHTTPRequestHandler):
         if environ.get("HTTP_TRANSFER_ENCODING", "").strip().lower() == "chunked":
             environ["wsgi.input_terminated"] = True
             environ["wsgi.input"] = DechunkedInput(environ["wsgi.input"])
-        # 根据 RFC 2616，如果 URL 是绝对路径，则使用该路径作为主机名。
-        # 使用“has a scheme”来表示绝对 URL。
-        if request_url.scheme and request_url.netloc:
-            environ["HTTP_HOST"] = request_url.netloc
+        if request_host is not None:
+            environ["HTTP_HOST"] = request_host
 
-        try:
-            # binary_form=False给出了更友好的信息，但是和Nginx和Apache的返回可能不兼容
-            peer_cert = self.connection.getpeercert(binary_form=True)
-            if peer_cert is not None:
-                # Nginx 和 Apache使用PEM格式
-                environ["SSL_CLIENT_CERT"] = ssl.DER_cert_to_PEM_cert(peer_cert)
-        except AttributeError:
-            # 不使用TLS， socket 没有 getpeercert 方法
-            pass
+        # handler实例与连接一一对应，同一TLS会话中peer证书不会变化，只需转换一次
+        if not hasattr(self, "_cached_ssl_pem"):
+            self._cached_ssl_pem: str | None = None
+            try:
+                # binary_form=False给出了更友好的信息，但是和Nginx和Apache的返回可能不兼容
+                peer_cert = self.connection.getpeercert(binary_form=True)
+                if peer_cert is not None:
+                    # Nginx 和 Apache使用PEM格式
+                    self._cached_ssl_pem = ssl.DER_cert_to_PEM_cert(peer_cert)
+            except AttributeError:
+                # 不使用TLS， socket 没有 getpeercert 方法
+                pass
+
+        if self._cached_ssl_pem is not None:
+            environ["SSL_CLIENT_CERT"] = self._cached_ssl_pem
 
         return environ
 
     def run_wsgi(self) -> None:
         if self.headers.get("Expect", "").lower().strip() == "100-continue":
             self.wfile.write(b" HTTP/1.1 100 Continue\r\n\r\n")
+            # wfile有缓冲，客户端要在收到100 Continue后才会发送body，必须立即发出
+            self.wfile.flush()
 
         self.environ = environ = self.make_environ()
         status_set: str | None = None
@@ -171,10 +223,16 @@ class WSGIRequestHandler(BaseHTTPRequestHandler):
                 except ValueError:
                     code_str, msg = status_sent, ""
                 code = int(code_str)
-                self.send_response(code, msg)
+                self.log_request(code)
+                # 将状态行和所有header拼接后一次性写入，而不是逐个send_header
+                header_lines = [
+                    f"{self.protocol_version} {code} {msg}\r\n",
+                    f"Server: {self.version_string()}\r\n",
+                    f"Date: {self.date_time_string()}\r\n",
+                ]
                 header_keys = set()
                 for key, value in headers_sent:
-                    self.send_header(key, value)
+                    header_lines.append(f"{key}: {value}\r\n")
                     header_keys.add(key.lower())
 
                 # 如果没有内容长度，使用块传输编码。不要使用1xx和204响应。
@@ -188,18 +246,32 @@ class WSGIRequestHandler(BaseHTTPRequestHandler):
                         or (100 <= code < 200)
                         or code in {204, 304}
                     )
-                    and self.protocal_version >= "HTTP/1.1"
+                    and self.protocol_version >= "HTTP/1.1"
                 ): 
                     chunk_response = True
-                    self.send_header("Transfer-Encoding", "chunked")
+                    header_lines.append("Transfer-Encoding: chunked\r\n")
                 
                 # 总是关闭连接。禁用HTTP/1.1的keep-alive连接，Python 的 http.server 
                 # 无法很好地处理它们，因为它不知道如何在下一个请求行之前清空流。
-                self.send_header("Connection", "close")
-                self.end_headers()
+                header_lines.append("Connection: close\r\n\r\n")
+                self.close_connection = True
+                if self.request_version != "HTTP/0.9":
+                    self.wfile.write("".join(header_lines).encode("latin-1"))
             assert isinstance(data, bytes), "applications must write bytes"
 
-            if data:
+            if (
+                len(data) >= LARGE_CHUNK_SIZE
+                and self.server.ssl_context is None
+            ):
+                # 大数据块绕过wfile的缓冲区，直接交给socket，省去一次内存拷贝
+                self.wfile.flush()
+                if chunk_response:
+                    _send_parts(
+                        self.connection, [b"%x\r\n" % len(data), data, b"\r\n"]
+                    )
+                else:
+                    self.connection.sendall(data)
+            elif data:
                 if chunk_response:
                     self.wfile.write(hex(len(data))[2:].encode())
                     self.wfile.write(b"\r\n")
@@ -231,6 +303,8 @@ class WSGIRequestHandler(BaseHTTPRequestHandler):
                     write(b"")
                 if chunk_response:
                     self.wfile.write(b"0\r\n\r\n")
+                    # 在下面丢弃剩余请求数据之前，让客户端先收到完整的响应
+                    self.wfile.flush()
             finally:
                 # 检查read socket中是否还有剩余数据，并将其丢弃。这将读取超过 
                 # request.max_content_length 的数据，但可以让客户端看到 413 响应，
@@ -307,30 +381,38 @@ class WSGIRequestHandler(BaseHTTPRequestHandler):
         return getattr(super(), name)
 
     def address_string(self) -> str:
-        if getattr(self, "environ", None):
-            return self.environ["REMOTE_ADDR"] # type: ignore
+        if self._remote_addr is not None:
+            return self._remote_addr
 
         if not self.client_address:
             return "<local>"
         return self.client_address[0]
 
     def port_integer(self) -> int:
-        return self.client_address[1]        
+        if self._remote_port is not None:
+            return self._remote_port
+        return self.client_address[1]
+
+_ansi_codes = {
+    "bold": "1",
+    "red": "31",
+    "green": "32",
+    "yellow": "33",
+    "magenta": "35",
+    "cyan": "36",
+}
+# 样式组合 -> 拼接好的ANSI前缀，调用方传入的样式都是固定的字面量
+_ansi_prefix_cache: dict[tuple[str, ...], str] = {}
 
 def _ansi_style(value: str, *styles: str) -> str:
     """为终端输出添加ANSI样式"""
     if not _log_add_style: return value
-    codes = {
-        "bold": "1",
-        "red": "31",
-        "green": "32",
-        "yellow": "33",
-        "megenta": "35",
-        "cyan": "36",
-    }
-    for style in styles:
-        value = f"\x1b[{codes[style]}m{value}"
-    return f"{value}\x1b[0m"
+    prefix = _ansi_prefix_cache.get(styles)
+    if prefix is None:
+        # 与逐个包裹value的顺序一致，最后一个样式在最外层
+        prefix = "".join(f"\x1b[{_ansi_codes[style]}m" for style in reversed(styles))
+        _ansi_prefix_cache[styles] = prefix
+    return f"{prefix}{value}\x1b[0m"
 
 def generate_adhoc_ssl_pair(
     cn: str | None = None,
@@ -377,6 +459,12 @@ def generate_adhoc_ssl_pair(
 
 def generate_adhoc_ssl_context() -> ssl.SSLContext:
     """生成一个用于开发服务的adhoc SSL上下文"""
+    return load_ssl_context(*_write_adhoc_ssl_files())
+
+def _write_adhoc_ssl_files() -> tuple[str, str]:
+    """生成adhoc证书和私钥并写入临时文件，返回(cert_file, pkey_file)。
+    文件在创建它们的进程退出时删除
+    """
     import atexit
     import tempfile
 
@@ -400,8 +488,7 @@ def generate_adhoc_ssl_context() -> ssl.SSLContext:
     )
     os.close(cert_handle)
     os.close(pkey_handle)
-    ctx = load_ssl_context(cert_file, pkey_file)
-    return ctx
+    return cert_file, pkey_file
 
 def load_ssl_context(
     certfile: str, pkey_file: str | None = None, protocol: int | None = None
@@ -466,6 +553,7 @@ class BaseWSGIServer(HTTPServer):
     multithread = False
     multiprocess = False
     request_queue_size = LISTEN_QUEUE # 128
+    socket_buffer_size = SOCKET_BUFFER_SIZE # 1MB
     allow_reuse_address = True
 
     def __init__(
@@ -560,6 +648,25 @@ class BaseWSGIServer(HTTPServer):
         from mywerkzeug import __version__
         self._server_version = f"Mywerkzeug/{__version__}"
 
+    def server_bind(self) -> None:
+        super().server_bind()
+        # 监听socket上设置的缓冲区大小会被accept出的连接继承，较大的内核缓冲区
+        # 可以减少流式响应时的系统调用次数
+        if self.address_family != af_unix:
+            self.socket.setsockopt(
+                socket.SOL_SOCKET, socket.SO_RCVBUF, self.socket_buffer_size
+            )
+            self.socket.setsockopt(
+                socket.SOL_SOCKET, socket.SO_SNDBUF, self.socket_buffer_size
+            )
+
+    def get_request(self) -> tuple[socket.socket, t.Any]:
+        request, client_address = self.socket.accept()
+        # 关闭Nagle算法，避免chunked响应中的小数据块被延迟发送
+        if self.address_family != af_unix:
+            request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return request, client_address
+
     def log(self, type: str, message: str, *args: t.Any) -> None:
         _log(type, message, *args)
 
@@ -737,6 +844,20 @@ def run_simple(
         # 除了localhost域名，允许特殊的hostname使用debugger
         application.trusted_host.append(hostname)
 
+    if ssl_context == "adhoc" and use_reloader:
+        # reloader重启子进程时复用父进程生成的证书，避免每次重启都重新生成RSA key。
+        # 文件由父进程在退出时清理，环境变量只在使用reloader时导出
+        if not is_running_from_reloader():
+            cert_file, pkey_file = _write_adhoc_ssl_files()
+            os.environ["MYWERKZEUG_ADHOC_CERT"] = cert_file
+            os.environ["MYWERKZEUG_ADHOC_KEY"] = pkey_file
+            ssl_context = (cert_file, pkey_file)
+        else:
+            cert_file = os.environ.get("MYWERKZEUG_ADHOC_CERT", "")
+            pkey_file = os.environ.get("MYWERKZEUG_ADHOC_KEY", "")
+            if os.path.exists(cert_file) and os.path.exists(pkey_file):
+                ssl_context = (cert_file, pkey_file)
+
     if not is_running_from_reloader():
         fd = None
     else:
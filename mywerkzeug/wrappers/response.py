@@ -1,8 +1,11 @@
 import typing as t
+from functools import lru_cache
+from urllib.parse import urljoin
 
 from myhttp import HTTPStatus
 
 from ..datastructures import Headers
+from ..http import remove_entity_headers
 from ..sansio.response import Response as _SansIOResponse
 from ..urls import iri_to_uri
 from ..wsgi import ClosingIterator
@@ -12,6 +15,15 @@ if t.TYPE_CHECKING:
     from _typeshed.wsgi import StartResponse
     from _typeshed.wsgi import WSGIEnvironment
 
+_bytes_types = frozenset((bytes, bytearray))
+
+# 不能发送Content-Length的状态码(1xx和204)，以及不能带有响应体的状态码
+_no_content_length_statuses = frozenset([*range(100, 200), 204])
+_no_body_statuses = _no_content_length_statuses | {304}
+
+# 应用通常只会重定向到少数几个固定的URL，缓存Location等header的转换结果
+_cached_iri_to_uri = lru_cache(maxsize=256)(iri_to_uri)
+
 def _iter_encoded(iterable: t.Iterable[str | bytes]) -> t.Iterable[bytes]:
     for item in iterable:
         if isinstance(item, str):
@@ -115,7 +127,23 @@ class Response(_SansIOResponse):
         """迭代响应，并使用响应中的encoding对其进行编码， 若响应对象作为一个WSGI应用
         被调用，此方法返回值被用作应用迭代器，除非:attr:`direct_passthrough`被激活
         """
-        return _iter_encoded(self.response)
+        response = self.response
+        if self.is_sequence:
+            if len(response) == 1:  # type: ignore[arg-type]
+                # set_data生成的单元素列表最常见，只检查这一个元素，不构建类型集合
+                item = response[0]  # type: ignore[index]
+                if type(item) is str:
+                    return iter((item.encode(),))
+                if type(item) in _bytes_types:
+                    return iter(response)
+            else:
+                # 被缓存的响应只需检查一次元素类型，全为bytes或全为str时跳过逐项判断
+                types = set(map(type, response))
+                if types <= _bytes_types:
+                    return iter(response)  # type: ignore[arg-type]
+                if types == {str}:
+                    return map(str.encode, response)  # type: ignore[arg-type]
+        return _iter_encoded(response)
 
     @property
     def is_sequence(self) -> bool:
@@ -136,12 +164,23 @@ class Response(_SansIOResponse):
         bytes. If a string is set it's encoded to the charset of the
         response (utf-8 by default).
         """
-        value = value.encode()
+        if isinstance(value, str):
+            value = value.encode()
         self.response = [value]
         if self.automatically_set_content_length:
-            self.headers["Content-Length"] = str(len(value))
+            # 直接传入int，由Headers转换为字符串
+            self.headers["Content-Length"] = len(value)
 
-    def get_wsgi_headers(self, environ: WSGIEnvironment) -> Headers:
+    def get_wsgi_headers(
+        self,
+        environ: WSGIEnvironment,
+        *,
+        # 每个响应都会调用，将用到的全局函数绑定为局部变量
+        _iri_to_uri: t.Callable[[str], str] = _cached_iri_to_uri,
+        _get_current_url: t.Callable[..., str] = get_current_url,
+        _urljoin: t.Callable[[str, str], str] = urljoin,
+        _remove_entity_headers: t.Callable[[Headers], None] = remove_entity_headers,
+    ) -> Headers:
         """This is automatically called right before the response is started
         and returns headers modified for the given environment. It returns a
         copy of the headers from the response with some modifications applied
@@ -164,12 +203,14 @@ class Response(_SansIOResponse):
         :param environ: theWSGI environment of the request.
         :return: returns a new class (werkzeug.datastructures.Headers) obj
         """
-        headers = Headers(self.headers)
+        headers = self.headers.copy()
         location: str | None = None
         content_location: str | None = None
         content_length: str | int | None = None
         status = self.status_code
 
+        # Headers.get同样是逐个比较小写key的线性查找，分别查找三个header需要遍历
+        # 三次，这里一次遍历同时取出所有需要的值
         for key, value in headers:
             ikey = key.lower()
             if ikey == "location":
@@ -179,27 +220,27 @@ class Response(_SansIOResponse):
             elif ikey == "content-length":
                 content_length = value
         if location is not None:
-            location = iri_to_uri(location)
+            location = _iri_to_uri(location)
 
             if self.autocorrect_location_header:
                 # Make the location header an absolute URL.
-                current_url = get_current_url(environ, strip_querystring=True)
-                current_url = iri_to_uri(current_url)
-                location = urljoin(current_url, location)
+                current_url = _get_current_url(environ, strip_querystring=True)
+                current_url = _iri_to_uri(current_url)
+                location = _urljoin(current_url, location)
             
             headers["Location"] = location
         
         # make sure the content location is a URL
         if content_location is not None:
-            headers["Content-Location"] = iri_to_uri(content_location)
+            headers["Content-Location"] = _iri_to_uri(content_location)
         
-        if 100 <= status < 200 or status == 204:
+        if status in _no_content_length_statuses:
             # Per section 3.3.2 of RFC 7230, "a server MUST NOT send a
             # Content-Length header field in any response with a status
             # code of 1xx (Informational) or 204 (No Content)."
             headers.remove("Content-Length")
         elif status == 304:
-            remove_entity_headers(headers)
+            _remove_entity_headers(headers)
 
         # if we can determine the content length automatically, we
         # should try to do that.  But only if this does not involve
@@ -210,10 +251,14 @@ class Response(_SansIOResponse):
             self.automatically_set_content_length
             and self.is_sequence
             and content_length is None
-            and status not in (204, 304)
-            and not (100 <= status < 200)
+            and status not in _no_body_statuses
         ):
-            content_length = sum(len(x) for x in self.iter_encoded())
+            response: t.Sequence[t.Any] = self.response  # type: ignore[assignment]
+            if len(response) == 1 and type(response[0]) is bytes:
+                # 单个bytes(如set_data设置的响应体)，直接取长度，无需再遍历编码
+                content_length = len(response[0])
+            else:
+                content_length = sum(len(x) for x in self.iter_encoded())
             headers["Content-Length"] = str(content_length)
         return headers
 
@@ -230,8 +275,7 @@ class Response(_SansIOResponse):
         status = self.status_code
         if (
             environ["REQUEST_METHOD"] == "HEAD"
-            or 100 <= status < 200
-            or status in (204, 304)
+            or status in _no_body_statuses
         ):
             iterable: t.Iterable[bytes] = ()
         elif self.direct_passthrough:
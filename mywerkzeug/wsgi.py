@@ -1,6 +1,5 @@
 
 import typing as t
-from functools import partial
 
 from .sansio import utils as _sansio_utils
 
@@ -12,8 +11,11 @@ def get_path_info(environ: WSGIEnvironment) -> str:
 
     :param environ: 用于获取path的WSGI环境
     """
-    path: bytes = environ.get("PATH_INFO", "").encode("latin1")
-    return path.decode(errors="replace")
+    path: str = environ.get("PATH_INFO", "")
+    # 纯ASCII的路径经过latin1编码再utf-8解码后不变，直接返回
+    if path.isascii():
+        return path
+    return path.encode("latin1").decode(errors="replace")
 
 class ClosingIterator:
     """WSGI 规范要求所有中间件和网关都必须遵守应用程序返回的可迭代对象的 `close` 回调。
@@ -36,8 +38,7 @@ class ClosingIterator:
         callbacks: None
         | (t.Callable[[], None] | t.Iterable[t.Callable[[], None]]) = None,
     ) -> None:
-        iterator = iter(iterable)
-        self._next = t.cast(t.Callable[[], bytes], partial(next, iterator))
+        self._next = t.cast(t.Callable[[], bytes], iter(iterable).__next__)
         if callbacks is None:
             callbacks = []
         elif callable(callbacks):
@@ -167,5 +168,19 @@ class FileWrapper:
     def __init__(self, file: t.IO[bytes], buffer_size: int = 8192) -> None:
         self.file = file
         self.buffer_size = buffer_size
+
+    def close(self) -> None:
+        if hasattr(self.file, "close"):
+            self.file.close()
+
+    def __iter__(self) -> FileWrapper:
+        return self
+
+    def __next__(self) -> bytes:
+        data = self.file.read(self.buffer_size)
+        if data:
+            return data
+        raise StopIteration()
+
         
 
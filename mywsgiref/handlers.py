@@ -5,18 +5,29 @@ import time
 from mywsgiref.headers import Headers
 from mywsgiref.util import FileWrapper, guess_scheme, is_hop_by_hop
 
-__all__ = ['BaseHandler', 'SimpleHandler']
+__all__ = ['BaseHandler', 'SimpleHandler', 'SendfileHandler']
 
 _weekdayname =["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 _monthname = [None,
               "Jan", "Feb", "Mar", "Apr", "May", "Jun",
               "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
 
+# (second, formatted) of the last call; most responses share the same second
+_date_cache = (-1, "")
+
 def format_date_time(timestamp):
-    year, month, day, hh, mm, ss, wd, y, z = time.gmtime(timestamp)
-    return "%s, %02d %3s %04d %02d:%02d:%02d GMT" % (
-        _weekdayname[wd], day, _monthname[month], year, hh, mm, ss
+    global _date_cache
+    ts = int(timestamp)
+    cached_ts, cached = _date_cache
+    if ts == cached_ts:
+        return cached
+    year, month, day, hh, mm, ss, wd, y, z = time.gmtime(ts)
+    formatted = (
+        f"{_weekdayname[wd]}, {day:02d} {_monthname[month]} {year:04d} "
+        f"{hh:02d}:{mm:02d}:{ss:02d} GMT"
     )
+    _date_cache = (ts, formatted)
+    return formatted
 
 class BaseHandler:
     """Manage the invocation of a WSGI application."""
@@ -35,6 +46,9 @@ class BaseHandler:
     wsgi_file_wrapper = FileWrapper
     headers_class = Headers
 
+    # Whether sendfile() is overridden; computed per class in __init_subclass__
+    _sendfile_overridden = False
+
     # Error handling (also pre-subclass or pre-instance)
     traceback_limit = None
     error_status = "500 Dude, this is whack!"
@@ -47,6 +61,9 @@ class BaseHandler:
     headers = None
     bytes_sent = 0
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._sendfile_overridden = cls.sendfile is not BaseHandler.sendfile
 
     def run(self, application):
         """Invoke the WSGI application."""
@@ -90,10 +107,24 @@ class BaseHandler:
     def finish_response(self):
         """Send any iterable data, then close self and the iterable."""
         try:
-            if not self.result_is_file() or not self.sendfile():
-                for data in self.result:
-                    print(f"BaseHandler:: data: {data}")
-                    self.write(data)
+            # Only subclasses with a real sendfile() need the file wrapper check
+            if not (
+                self._sendfile_overridden
+                and self.result_is_file()
+                and self.sendfile()
+            ):
+                chunks = iter(self.result)
+                write = self.write
+                # The first chunk sends the headers through write()
+                for data in chunks:
+                    write(data)
+                    break
+                if self.headers_sent and type(self).write is BaseHandler.write:
+                    # Headers are out, the remaining chunks skip the state
+                    # checks; subclasses overriding write() keep getting calls
+                    write = self._body_writer()
+                for data in chunks:
+                    write(data)
                 self.finish_content()
         finally:
             self.close()
@@ -120,8 +151,10 @@ class BaseHandler:
         self.cleanup_headers()
         self.headers_sent = True
         if not self.origin_server or self.client_is_modern():
-            self.send_preamble()
-            self._write(str(self.headers).encode('utf-8'))
+            # Preamble and headers go out in a single _write()
+            self._write(
+                self.build_preamble().encode('latin-1') + bytes(self.headers)
+            )
     
     def cleanup_headers(self):
         """Make any accessary header changes to default """
@@ -143,17 +176,18 @@ class BaseHandler:
         """True if client can accept status and headers."""
         return self.environ['SERVER_PROTOCOL'].upper() != 'HTTP/0.9'
     
-    def send_preamble(self):
-        """Transmit version/status/date/server, via self._write()."""
-        if self.origin_server:
-            if self.client_is_modern():
-                self._write(f'HTTP/{self.http_version} {self.status}\r\n'.encode('utf-8'))
-                if not self.headers.has_key('Date'):
-                    self._write(f'Date: {format_date_time(time.time())}\r\n'.encode('utf-8'))
-                if self.server_software and not self.headers.has_key('Server'):
-                    self._write(f'Server: {self.server_software}\r\n'.encode('utf-8'))
-        else:
-            self._write(f'Status: {self.status}\r\n')
+    def build_preamble(self):
+        """Return version/status/date/server lines to precede the headers."""
+        if not self.origin_server:
+            return f'Status: {self.status}\r\n'
+        if not self.client_is_modern():
+            return ''
+        parts = [f'HTTP/{self.http_version} {self.status}\r\n']
+        if not self.headers.has_key('Date'):
+            parts.append(f'Date: {format_date_time(time.time())}\r\n')
+        if self.server_software and not self.headers.has_key('Server'):
+            parts.append(f'Server: {self.server_software}\r\n')
+        return ''.join(parts)
 
     def close(self):
         """Close the iterable (if needed) and reset all instance vars"""
@@ -211,6 +245,18 @@ class BaseHandler:
         self._write(data)
         self._flush()
 
+    def _body_writer(self):
+        """Return a 'write()' for use once the headers have been sent."""
+        write_raw, flush = self._write, self._flush
+
+        def write(data):
+            assert type(data) is bytes, f"write() argument must be string {type(data)}"
+            self.bytes_sent += len(data)
+            write_raw(data)
+            flush()
+
+        return write
+
     def _write(self, data):
         """Override to buffer data for send to client."""
         raise NotImplementedError
@@ -224,6 +270,9 @@ class BaseHandler:
     def setup_environ(self):
         """Set up base environment for request"""
 
+        # PEP 3333 requires environ to be a builtin dict that the application
+        # may modify, so a ChainMap over os_environ cannot be used here.
+        # dict.copy() is a single C-level copy of the snapshot.
         env = self.environ = self.os_environ.copy()
         self.add_cgi_vars()
 
@@ -290,4 +339,46 @@ class SimpleHandler(BaseHandler):
 
     def _flush(self):
         self.stdout.flush()
-        self._flush = self.stdout.flush
\ No newline at end of file
+        self._flush = self.stdout.flush
+
+
+class SendfileHandler(SimpleHandler):
+    """SimpleHandler that sends file wrapper results with os.sendfile().
+
+    The file is copied by the kernel straight from its descriptor to the
+    descriptor behind 'stdout', so 'stdout' must be a plain file or socket
+    (not a TLS-wrapped one). Anything else falls back to the normal loop.
+    """
+    sendfile_blksize = 1 << 20
+
+    def sendfile(self):
+        if not hasattr(os, 'sendfile'):
+            return False
+        filelike = self.result.filelike
+        try:
+            in_fd = filelike.fileno()
+            out_fd = self.stdout.fileno()
+            # An explicit offset is required outside Linux; it also leaves
+            # the file position alone for the fallback loop
+            offset = filelike.tell()
+        except (AttributeError, OSError, ValueError):
+            return False
+
+        if not self.headers_sent:
+            self.send_headers()
+        # Anything still buffered in stdout must go out before the file body
+        self._flush()
+        start = offset
+        while True:
+            try:
+                sent = os.sendfile(out_fd, in_fd, offset, self.sendfile_blksize)
+            except OSError:
+                # Nothing of the body went out yet: let the normal loop send it
+                if offset == start:
+                    return False
+                raise
+            if not sent:
+                break
+            offset += sent
+            self.bytes_sent += sent
+        return True
@@ -5,16 +5,17 @@ written by Barry Warsaw.
 """
 
 from typing import List
-import re
-tspecials = re.compile(r'[ \(\)<>@,;:\\"/\[\]\?=]')
+# Characters that force a parameter value to be quoted
+_tspecials = frozenset(' ()<>@,;:\\"/[]?=')
+# Escape backslashes and double quotes in one pass over a quoted value
+_quote_table = str.maketrans({'\\': '\\\\', '"': '\\"'})
 
 
 def _formatparam(param, value=None, quote=1):
     """Return a key=value pair."""
     if value is not None and len(value) > 0:
-        if quote or tspecials.search(value):
-            value = value.replace('\\', '\\\\').replace('"', r'\"')
-            return '%s="%"s' % (param, value)
+        if quote or not _tspecials.isdisjoint(value):
+            return f'{param}="{value.translate(_quote_table)}"'
         else:
             return '%s=%s' % (param, value)
     else:
@@ -80,16 +81,24 @@ class Headers:
         return [kv[1] for kv in self._headers]
     
     def items(self):
-        """Return a list of all (key, value) pairs."""
-        return self._headers[:]
+        """Return an iterator over all (key, value) pairs.
+
+        No copy is made: call list() on the result when the headers are
+        modified while iterating, or when a list is needed.
+        """
+        return iter(self._headers)
     
     def __repr__(self):
         return "Headers(%s)" % self._headers
     
     def __str__(self):
         """Return the formatted headers, suitable for HTTP transmission."""
-        return '\r\n'.join(["%s: %s" % kv for kv in self._headers] + ['',''])
+        return ''.join([f'{k}: {v}\r\n' for k, v in self._headers]) + '\r\n'
     
+    def __bytes__(self):
+        """Return the formatted headers as latin-1 bytes, ready to be written."""
+        return str(self).encode('latin-1')
+
     def setdefault(self,name,value):
         """Return first match header value for 'name', or 'value',
         if not exist, add to self._headers."""
@@ -1,6 +1,8 @@
 """WSGI-related Utilities"""
 
 import posixpath
+from io import StringIO
+from urllib.parse import quote
 
 __all__ = [
     'guess_scheme', 'request_uri', 'application_uri', 'shift_path_info',
@@ -24,15 +26,20 @@ class FileWrapper:
     def __iter__(self):
         return self
     
-    def next(self):
+    def __next__(self):
         data = self.filelike.read(self.blksize)
         if data:
             return data
         raise StopIteration
 
+# Values of the CGI 'HTTPS' variable (compared lower-cased) that mean the
+# request came over TLS
+_https_on = frozenset(('yes', 'on', '1', 'true'))
+
 def guess_scheme(environ: dict) -> str:
     """Guess the 'wsgi.url_scheme' is 'http' or 'https'."""
-    if environ.get('HTTPS') in ('yes', 'on', '1'):
+    https = environ.get('HTTPS')
+    if https and https.lower() in _https_on:
         return 'https'
     else:
         return 'http'
@@ -40,20 +47,22 @@ def guess_scheme(environ: dict) -> str:
 
 def application_uri(environ: dict) -> str:
     """Return base URI, no PATH_INFO or QUERY_STRING."""
-    url = environ['wsgi.url_scheme'] + '://'
-    from urllib import quote
+    scheme = environ['wsgi.url_scheme']
+    url = scheme + '://'
 
-    if environ.get('HTTP_HOST'):
-        url += environ['HTTP_HOST']
+    host = environ.get('HTTP_HOST')
+    if host:
+        url += host
     else:
         url += environ['SERVER_NAME']
         
-        if environ['wsgi.url_scheme'] == 'https':
-            if environ['SERVER_PORT'] != '443':
-                url += ':' + environ['SERVER_PORT']
+        port = environ['SERVER_PORT']
+        if scheme == 'https':
+            if port != '443':
+                url += ':' + port
         else:
-            if environ['SERVER_PORT'] != '80':
-                url += ':' + environ['SERVER_PORT']
+            if port != '80':
+                url += ':' + port
     
     # quote - example: SCRIPT_NAME = '/my%20app'
     url += quote(environ.get('SCRIPT_NAME') or '/')
@@ -62,7 +71,6 @@ def application_uri(environ: dict) -> str:
 def request_uri(environ: dict, include_query:int = 1) -> str:
     """Return the full rquest URI, optionally including the query string."""
     url = application_uri(environ)
-    from urllib import quote
     path_info = quote(environ.get('PATH_INFO', ''))
     if not environ.get('SCRIPT_NAME'):
         # url = "http://localhost:8000/" + path_info[1:]
@@ -70,8 +78,10 @@ def request_uri(environ: dict, include_query:int = 1) -> str:
     else:
         # url = "http://localhost:8000/my%20app" + path_info
         url += path_info
-    if include_query and environ.get('QUERY_STRING'):
-        url += '?' + environ['QUERY_STRING']
+    if include_query:
+        query = environ.get('QUERY_STRING')
+        if query:
+            url += '?' + query
     return url
 
 def shift_path_info(environ: dict) -> str:
@@ -79,12 +89,24 @@ def shift_path_info(environ: dict) -> str:
     path_info = environ.get('PATH_INFO', '')
     if not path_info: return None
 
+    script_name = environ.get('SCRIPT_NAME', '')
+    # fast path: nothing for normpath or the segment filter to clean up,
+    # so the first segment can be split off directly
+    if (path_info[0] == '/' and '//' not in path_info 
+            and '/./' not in path_info):
+        _, name, *rest = path_info.split('/', 2)
+        joined = script_name + '/' + name
+        if (name and name != '..' and joined[0] != '.' 
+                and '//' not in joined and '/.' not in joined):
+            environ['SCRIPT_NAME'] = joined
+            environ['PATH_INFO'] = '/' + rest[0] if rest else ''
+            return name
+
     path_parts = path_info.split('/')
     path_parts[1:-1] = [p for p in path_parts[1:-1] if p and p!='.']
     name = path_parts[1]
     del path_parts[1]
 
-    script_name = environ.get('SCRIPT_NAME', '')
     # process and concatenate path parts, deal with  '.', '..' 
     script_name = posixpath.normpath(script_name+'/'+name)
     if script_name.endswith('/'):
@@ -118,9 +140,11 @@ def setup_testing_defaults(environ: dict) -> None:
     environ.setdefault('wsgi.multithread', 0)
     environ.setdefault('wsgi.multiprocess', 0)
 
-    from io import StringIO
-    environ.setdefault('wsgi.input', StringIO(""))
-    environ.setdefault('wsgi.errors', StringIO())
+    # not setdefault(), which would build the StringIO even when unused
+    if 'wsgi.input' not in environ:
+        environ['wsgi.input'] = StringIO("")
+    if 'wsgi.errors' not in environ:
+        environ['wsgi.errors'] = StringIO()
     environ.setdefault('wsgi.url_scheme', guess_scheme(environ))
     
     if environ['wsgi.url_scheme'] == 'http':
@@ -128,14 +152,23 @@ def setup_testing_defaults(environ: dict) -> None:
     elif environ['wsgi.url_scheme'] == 'https':
         environ.setdefault('SERVER_PORT', '443')
 
-_hoppish = {
-    'connection': 1, 'keep-alive': 1, 'proxy-authenticate': 1,
-    'proxy-authorization': 1, 'te': 1, 'trailers': 1, 'transfer-encoding': 1,
-    'upgrade': 1
-}.__contains__
+_hop_headers = frozenset((
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailers', 'transfer-encoding', 'upgrade'
+))
+# Membership test on an already lower-cased header name
+_hoppish = _hop_headers.__contains__
+# Lengths of the hop-by-hop names; most other headers are ruled out by
+# length alone, before any lower() copy or string hash
+_hop_lengths = frozenset(map(len, _hop_headers))
 
 def is_hop_by_hop(header_name: str) -> bool:
     """Return True if 'header_name' is a hop-by-hop header."""
+    if len(header_name) not in _hop_lengths:
+        return False
+    # Skip the lower() copy for names that are already lower-case
+    if header_name.islower():
+        return _hoppish(header_name)
     return _hoppish(header_name.lower())
 
 
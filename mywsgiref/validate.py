@@ -108,18 +108,32 @@ Some of the things this checks:
 __all__ = ['validator']
 
 import re
+import string
 import sys
 import warnings
 
 # start with a letter, followed by letters, digits, _, - 
-header_re = re.compile(r'^[a-zA-Z][a-zA-Z0-9\-_]*$')
+# (deleting the allowed characters must leave nothing behind)
+_header_name_reject = str.maketrans('', '', 
+    string.ascii_letters + string.digits + '-_')
 # \000-\037 are control characters
 bad_header_value_re = re.compile(r'[\000-\037]')
 
+_required_environ = frozenset([
+    'REQUEST_METHOD', 'SERVER_NAME', 'SERVER_PORT',
+    'wsgi.version', 'wsgi.input', 'wsgi.errors',
+    'wsgi.multithread', 'wsgi.multiprocess', 'wsgi.run_once'])
+_forbidden_environ = frozenset(['HTTP_CONTENT_TYPE', 'HTTP_CONTENT_LENGTH'])
+
 
 def assert_(cond, *args):
     if not cond: raise AssertionError(*args)
 
+def _is_header_name(name):
+    """Same as matching ``^[a-zA-Z][a-zA-Z0-9\\-_]*$``, without a regex."""
+    return (bool(name) and name[0] in string.ascii_letters
+            and not name.translate(_header_name_reject))
+
 def validator(application):
     """Check for WSGI compliancy on a number of levels."""
     def lint_app(*args, **kw):
@@ -142,9 +156,9 @@ def validator(application):
             else:
                 exc_info = None
             
-            check_status(status)
+            status_code = check_status(status)
             check_headers(headers)
-            check_content_type(status, headers)
+            check_content_type(status_code, headers)
             check_exc_info(exc_info)
 
             start_response_started.append(None)
@@ -171,15 +185,12 @@ def check_environ(environ):
         f"Environment is not of the right type: {type(environ)} \
         (envrionment: {environ})")
     
-    for key in ['REQUEST_METHOD', 'SERVER_NAME', 'SERVER_PORT',
-                'wsgi.version', 'wsgi.input', 'wsgi.errors',
-                'wsgi.multithread', 'wsgi.multiprocess', 
-                'wsgi.run_once']:
-        assert_(key in environ, 
-            f"Environment missing required key: {key}")
+    missing = _required_environ - environ.keys()
+    assert_(not missing, 
+        f"Environment missing required key: {', '.join(sorted(missing))}")
     
-    for key in ['HTTP_CONTENT_TYPE', 'HTTP_CONTENT_LENGTH']:
-        assert_(key not in environ,
+    for key in _forbidden_environ & environ.keys():
+        assert_(0,
             f"Environment should not have the key: {key} \
             (use {key[5:]} instead)")
 
@@ -188,13 +199,13 @@ def check_environ(environ):
             'QUERY_STRING is missing, will use sys.argv, '
             'so application errors are more likely')
         
-    for key in environ.keys():
-        for '.' in key:
+    for key, value in environ.items():
+        if '.' in key:
             # Extension, we don't care about its type
             continue
-        assert_(type(environ[key]) is str,
+        assert_(type(value) is str,
             f"Environmental variable {key} is not a string: "
-            f"{type(environ[key])} (value: {environ[key]})")
+            f"{type(value)} (value: {value})")
 
     assert_(type(environ['wsgi.version']) is tuple,
         f"wsgi.version should be a tuple {environ['wsgi.version']}")
@@ -210,22 +221,23 @@ def check_environ(environ):
         warnings.warn(
             f"REQUEST_METHOD unknown: {environ['REQUEST_METHOD']}")
 
-    assert_(not environ.get("SCRIPT_NAME") 
-        or environ["SCRIPT_NAME"].startswith("/"),
-        f"SCRIPT_NAME should start with /: {environ['SCRIPT_NAME']}")
-    assert_(not environ.get("PATH_INFO") 
-        or environ["PATH_INFO"].startswith("/"),
-        f"PATH_INFO should start with /: {environ['PATH_INFO']}")
-
-    if environ.get('CONTENT_LENGTH'):
-        assert_(int(environ['CONTENT_LENGTH']) >= 0,
-            f"Invalid CONTENT_LENGTH: {environ['CONTENT_LENGTH']}")
+    script_name = environ.get("SCRIPT_NAME")
+    path_info = environ.get("PATH_INFO")
+    assert_(not script_name or script_name.startswith("/"),
+        f"SCRIPT_NAME should start with /: {script_name}")
+    assert_(not path_info or path_info.startswith("/"),
+        f"PATH_INFO should start with /: {path_info}")
+
+    content_length = environ.get('CONTENT_LENGTH')
+    if content_length:
+        assert_(int(content_length) >= 0,
+            f"Invalid CONTENT_LENGTH: {content_length}")
     
-    if not environ.get('SCRIPT_NAME'):
-        assert_(environ.has_key('PATH_INFO'),
+    if not script_name:
+        assert_(path_info is not None,
             "One of SCRIPT_NAME or PATH_INFO must be set, (PATH_INFO "
             "should at least be '/' if SCRIPT_NAME is empty)")
-    assert_(environ.get('SCRIPT_NAME') != '/',
+    assert_(script_name != '/',
         "SCRIPT_NAME cannot be '/', it should instead be '', and "
         "PATH_INFO should be '/'")
 
@@ -256,35 +268,45 @@ def check_status(status: str):
         warnings.warn(
             "The status string {status} should be a three-digit integer "
             "followed by a single space and status message.")
+    return status_int
 
 def check_headers(headers):
-    assert_(type(headers) is list,
-        f"Headers {headers} must be of type list: {type(headers)}")
-    header_names = {}
+    # Messages are only formatted on failure: this runs for every response
+    if type(headers) is not list:
+        raise AssertionError(
+            f"Headers {headers} must be of type list: {type(headers)}")
+    header_names = set()
     for item in headers:
-        assert_(type(item) is tuple,
-            f"Individual headers {headers} must be of type tuple: \
-            {type(item)}")
-    
-        assert_(len(item) == 2)
+        if type(item) is not tuple:
+            raise AssertionError(
+                f"Individual headers {headers} must be of type tuple: "
+                f"{type(item)}")
+        if len(item) != 2:
+            raise AssertionError()
         name, value = item
-        assert_(name.lower() != 'status',
-            f"Header name {name} cannot be 'Status'; confilit with CGI "
-            "script, and HTTP status is not given through headers "
-            f"(value: {value})")
-        header_names[name.lower()] = None
-        assert_('\n' not in name and ":" not in name,
-            f"Header names may not contain ':' or '\\n': {name}")
-        assert_(header_re.search(name), 
-            f"Bad header name: {name}")
-        assert_(not name.endswith('-') and not name.endswith('_'), 
-            f"Name not end with '_' or '-': {name}")
-        if bad_header_value_re.search(value):
-            assert_(0, f"Bad header {value}: (bad char: \
-                {bad_header_value_re.search(value).group(0)})")
-
-def check_content_type(status, headers):
-    code = int(status.split(None, 1)[0])
+        lower_name = name.lower()
+        if lower_name == 'status':
+            raise AssertionError(
+                f"Header name {name} cannot be 'Status'; confilit with CGI "
+                "script, and HTTP status is not given through headers "
+                f"(value: {value})")
+        header_names.add(lower_name)
+        if '\n' in name or ":" in name:
+            raise AssertionError(
+                f"Header names may not contain ':' or '\\n': {name}")
+        if not _is_header_name(name):
+            raise AssertionError(f"Bad header name: {name}")
+        if name.endswith('-') or name.endswith('_'):
+            raise AssertionError(f"Name not end with '_' or '-': {name}")
+    # one scan over all the values; only look for the culprit on failure
+    if bad_header_value_re.search(''.join([value for _, value in headers])):
+        for _, value in headers:
+            bad = bad_header_value_re.search(value)
+            if bad:
+                raise AssertionError(
+                    f"Bad header {value}: (bad char: {bad.group(0)!r})")
+
+def check_content_type(code, headers):
     NO_MESSAGE_BODY = (204, 304)
     for name, value in headers:
         if name.lower() == 'content-type':
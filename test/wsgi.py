@@ -22,9 +22,10 @@ test_cases = [
     "good/boyy",
 ]
 
-for pattern , desc in patterns:
+compiled_patterns = [(pattern, desc, re.compile(pattern)) for pattern, desc in patterns]
+
+for pattern, desc, compiled in compiled_patterns:
     print(f"Mode: {pattern:15} Means: {desc}")
-    compiled = re.compile(pattern)
     for test in test_cases:
         if compiled.match(test):
             print(f"Match: {test}")